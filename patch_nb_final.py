@@ -3,7 +3,7 @@ import os
 import glob
 import re
 
-notebook_dir = r'c:\mon-apprentissage-dev\fleetopti-ml\notebooks'
+notebook_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'notebooks')
 notebooks = glob.glob(os.path.join(notebook_dir, "*.ipynb"))
 
 def patch_source(source):
@@ -0,0 +1,39 @@
+"""FleetOpti ML : prétraitement, entraînement, export et exploitation des modèles.
+
+Les sous-modules sont chargés à la demande : ``import src`` ne tire ni pandas,
+ni scikit-learn, ni skl2onnx/onnx. Les commandes courtes (score, inspect)
+ne paient ainsi que les imports dont elles ont réellement besoin.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "load_maintenance_data": "preprocessing",
+    "load_co2_data": "preprocessing",
+    "load_logistics_data": "preprocessing",
+    "load_telematics_data": "preprocessing",
+    "export_metadata": "preprocessing",
+    "prepare_splits": "preprocessing",
+    "stream_splits": "streaming_split",
+    "export_onnx": "onnx_export",
+    "export_checkpoint": "onnx_export",
+    "assign_missions": "assignment",
+    "DriftMonitor": "drift_monitor",
+    "train_maintenance_model": "train_maintenance",
+    "train_co2_model": "train_co2",
+    "train_logistics_model": "train_logistics",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,258 @@
+"""Réaffectation véhicules -> missions pilotée par le modèle logistique.
+
+Toutes les paires véhicule x mission candidates sont scorées en un seul lot,
+puis l'affectation de coût minimal est résolue sur le graphe biparti creux
+(scipy.sparse.csgraph.min_weight_full_bipartite_matching, variante creuse de
+l'algorithme hongrois). Pour tenir des milliers de véhicules et de missions,
+chaque mission ne garde que 2k véhicules candidats avant le scoring par le
+modèle (élagage) : k autour de sa place dans une affectation gloutonne par
+capacité, et les k véhicules assez grands au risque a priori le plus faible
+(véhicules scorés une fois sur une mission "neutre"), pour que les véhicules
+robustes mais surdimensionnés restent accessibles.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from .preprocessing import category_labels, standardize
+
+# Colonnes décrivant la mission (le reste des features décrit le véhicule)
+MISSION_FEATURES = ['Actual_Load', 'Weather_Conditions', 'Road_Conditions', 'Delivery_Times']
+
+# Coût de l'arête fictive "mission non affectée" : supérieur à tout coût réel
+UNASSIGNED_COST = 1e6
+
+
+def make_sklearn_scorer(model, scaler=None):
+    """Scorer renvoyant la probabilité de maintenance requise (classe 1)."""
+    positive = list(model.classes_).index(1)
+
+    def score(X):
+        if scaler is not None:
+            X = scaler.transform(X)
+        return model.predict_proba(X)[:, positive]
+    return score
+
+
+def make_onnx_scorer(session, metadata):
+    """Scorer basé sur une session onnxruntime (sortie ZipMap ou tenseur).
+
+    Les forêts sont entraînées sur des entrées standardisées : le scaler de
+    metadata.json est appliqué avant l'inférence.
+    """
+    input_name = session.get_inputs()[0].name
+
+    def score(X):
+        probs = session.run(None, {input_name: standardize(X, metadata)})[1]
+        if isinstance(probs, list):
+            return np.array([row[1] for row in probs], dtype=np.float64)
+        return np.asarray(probs)[:, 1]
+    return score
+
+
+def _encode(df, mappings):
+    """Applique les mappings de metadata.json aux colonnes textuelles."""
+    df = df.copy()
+    for col, mapping in (mappings or {}).items():
+        if col in df.columns and not is_numeric_dtype(df[col]):
+            df[col] = category_labels(df[col]).map(mapping).fillna(-1).astype(int)
+    return df
+
+
+def candidate_vehicles(capacity, loads, k, available=None):
+    """Indices (n_missions, k) des véhicules candidats de chaque mission (-1 : aucun).
+
+    Les véhicules disponibles sont triés une fois par capacité. Une affectation
+    gloutonne (missions par charge croissante, plus petit véhicule admissible
+    encore libre) donne à chaque mission un rang dans ce tri ; ses k candidats
+    forment une fenêtre centrée sur ce rang, jamais en dessous du premier véhicule
+    assez grand. Des missions de charge identique reçoivent ainsi des fenêtres
+    décalées au lieu de se disputer les mêmes k véhicules, et la solution
+    gloutonne (si elle existe) reste toujours parmi les candidats.
+    Coût O((n_vehicles + n_missions) log n + n_missions * k), sans matrice dense.
+    """
+    pool = np.arange(capacity.shape[0]) if available is None else np.flatnonzero(available)
+    order = pool[np.argsort(capacity[pool], kind='stable')]
+    n_pool = order.shape[0]
+    cand = np.full((loads.shape[0], k), -1, dtype=np.int64)
+    if n_pool == 0 or loads.shape[0] == 0:
+        return cand
+
+    # Premier véhicule (dans le tri) de capacité suffisante pour chaque mission
+    first = np.searchsorted(capacity[order], loads, side='left')
+    by_load = np.argsort(loads, kind='stable')
+    rank = np.arange(loads.shape[0])
+    # Rang glouton : greedy_r = max(first_r, greedy_{r-1} + 1) = r + max_{j<=r}(first_j - j)
+    greedy = np.empty_like(first)
+    greedy[by_load] = rank + np.maximum.accumulate(first[by_load] - rank)
+
+    start = np.minimum(greedy - k // 2, n_pool - k)
+    start = np.maximum(start, first)
+    window = start[:, None] + np.arange(k)[None, :]
+    valid = window < n_pool
+    cand[valid] = order[window[valid]]
+    return cand
+
+
+def risk_candidates(capacity, loads, prior_risk, k, available=None):
+    """Indices (n_missions, k) des véhicules assez grands au risque a priori le plus faible.
+
+    Missions traitées par charge décroissante : les véhicules admissibles forment
+    un ensemble croissant, tenu dans un tas par risque. Chaque mission prend les k
+    premiers du tas et se réserve le meilleur ; des missions de même charge voient
+    ainsi des listes décalées plutôt que les mêmes k véhicules.
+    Coût O(n_vehicles log n + n_missions * k log n).
+    """
+    pool = np.arange(capacity.shape[0]) if available is None else np.flatnonzero(available)
+    order = pool[np.argsort(-capacity[pool], kind='stable')]
+    cand = np.full((loads.shape[0], k), -1, dtype=np.int64)
+    heap, next_vehicle = [], 0
+    for m in np.argsort(-loads, kind='stable'):
+        while next_vehicle < order.shape[0] and capacity[order[next_vehicle]] >= loads[m]:
+            v = order[next_vehicle]
+            heapq.heappush(heap, (prior_risk[v], v))
+            next_vehicle += 1
+        best = [heapq.heappop(heap) for _ in range(min(k, len(heap)))]
+        cand[m, :len(best)] = [v for _, v in best]
+        for item in best[1:]:
+            heapq.heappush(heap, item)
+    return cand
+
+
+def _merge_candidates(*blocks):
+    """Concatène des blocs de candidats ; les doublons d'une même ligne deviennent -1."""
+    cand = np.sort(np.concatenate(blocks, axis=1), axis=1)
+    duplicate = np.zeros(cand.shape, dtype=bool)
+    duplicate[:, 1:] = cand[:, 1:] == cand[:, :-1]
+    cand[duplicate] = -1
+    return cand
+
+
+def pair_features(vehicle_X, mission_X, cand, features, mission_columns):
+    """Matrice (n_missions * k, n_features) des paires candidates, dans l'ordre des features."""
+    k = cand.shape[1]
+    safe = np.where(cand < 0, 0, cand)
+    X = vehicle_X[safe.ravel()]
+    for j in mission_columns:
+        X[:, j] = np.repeat(mission_X[:, j], k)
+    if 'Load_Utilization' in features:
+        load = X[:, features.index('Actual_Load')]
+        capacity = X[:, features.index('Load_Capacity')]
+        X[:, features.index('Load_Utilization')] = load / capacity
+    return X
+
+
+def _solve(cand, pair_cost, admissible, n_vehicles):
+    """Couplage de coût minimal ; renvoie (missions locales, véhicules) affectés."""
+    # Graphe biparti creux : arêtes candidates + une arête fictive par mission
+    # (colonne n_vehicles + i) qui garantit l'existence d'un couplage complet.
+    # Le solveur ignore les poids nuls, d'où le décalage de +1.
+    n_missions = cand.shape[0]
+    rows = np.concatenate([np.nonzero(admissible)[0], np.arange(n_missions)])
+    cols = np.concatenate([cand[admissible], n_vehicles + np.arange(n_missions)])
+    weights = np.concatenate([pair_cost[admissible], np.full(n_missions, UNASSIGNED_COST)]) + 1.0
+    graph = csr_matrix((weights, (rows, cols)), shape=(n_missions, n_vehicles + n_missions))
+    mission_idx, vehicle_idx = min_weight_full_bipartite_matching(graph)
+    chosen = vehicle_idx < n_vehicles
+    return mission_idx[chosen], vehicle_idx[chosen]
+
+
+def assign_missions(vehicles, missions, score_fn, features, mappings=None,
+                    k=32, utilization_weight=0.1, max_risk=None, max_rounds=3):
+    """Affecte au plus un véhicule par mission en minimisant le risque global.
+
+    vehicles : une ligne par véhicule (Vehicle_ID, Load_Capacity, état du véhicule).
+    missions : une ligne par mission (Actual_Load, conditions météo/route...).
+    score_fn : callable (X) -> probabilité de maintenance requise.
+    Coût d'une paire = risque + utilization_weight * (1 - Load_Utilization).
+    Chaque mission est scorée avec 2k véhicules candidats (voir candidate_vehicles
+    et risk_candidates).
+    Les paires dont le risque dépasse max_risk sont exclues. Les missions restées
+    sans véhicule sont ré-essayées (k doublé, véhicules encore libres) jusqu'à
+    max_rounds fois ; au-delà elles restent non affectées (vehicle_index = -1).
+    """
+    vehicles = _encode(vehicles.reset_index(drop=True), mappings)
+    missions = _encode(missions.reset_index(drop=True), mappings)
+
+    # Une colonne de mission absente du lot garde la valeur portée par le véhicule
+    mission_columns = [j for j, col in enumerate(features)
+                       if col in MISSION_FEATURES and col in missions.columns]
+    for col in ('Load_Capacity',) + tuple(f for j, f in enumerate(features)
+                                          if j not in mission_columns and f != 'Load_Utilization'):
+        if col not in vehicles.columns:
+            raise KeyError(f"Colonne vehicule manquante pour le scoring : {col}")
+    if 'Actual_Load' not in missions.columns:
+        raise KeyError("Colonne mission manquante : Actual_Load")
+
+    vehicle_X = np.zeros((len(vehicles), len(features)), dtype=np.float32)
+    mission_X = np.zeros((len(missions), len(features)), dtype=np.float32)
+    for j, col in enumerate(features):
+        if j in mission_columns:
+            mission_X[:, j] = missions[col].to_numpy(dtype=np.float32)
+        elif col != 'Load_Utilization':
+            vehicle_X[:, j] = vehicles[col].to_numpy(dtype=np.float32)
+
+    capacity = vehicles['Load_Capacity'].to_numpy(dtype=np.float64)
+    loads = missions['Actual_Load'].to_numpy(dtype=np.float64)
+    n_missions, n_vehicles = len(missions), len(vehicles)
+
+    assigned = np.full(n_missions, -1, dtype=np.int64)
+    out_risk = np.full(n_missions, np.nan)
+    out_utilization = np.full(n_missions, np.nan)
+    out_cost = np.full(n_missions, np.nan)
+    free = np.ones(n_vehicles, dtype=bool)
+    pending = np.arange(n_missions)
+
+    # Risque a priori de chaque véhicule : un seul scoring sur la mission médiane
+    prior_risk = np.zeros(n_vehicles)
+    if n_missions and n_vehicles:
+        neutral = np.median(mission_X, axis=0, keepdims=True)
+        everyone = np.arange(n_vehicles)[None, :]
+        prior_risk = np.asarray(score_fn(pair_features(vehicle_X, neutral, everyone, features,
+                                                       mission_columns)), dtype=np.float64)
+
+    for round_k in (k * 2 ** r for r in range(max_rounds)):
+        if pending.size == 0 or not free.any():
+            break
+        cand = _merge_candidates(
+            candidate_vehicles(capacity, loads[pending], round_k, available=free),
+            risk_candidates(capacity, loads[pending], prior_risk, round_k, available=free))
+
+        # Scoring de toutes les paires candidates en un seul appel au modèle
+        X = pair_features(vehicle_X, mission_X[pending], cand, features, mission_columns)
+        risk = np.asarray(score_fn(X), dtype=np.float64).reshape(cand.shape)
+        utilization = loads[pending][:, None] / capacity[np.where(cand < 0, 0, cand)]
+        pair_cost = risk + utilization_weight * (1.0 - utilization)
+
+        admissible = cand >= 0
+        if max_risk is not None:
+            admissible &= risk <= max_risk
+
+        local_idx, vehicle_idx = _solve(cand, pair_cost, admissible, n_vehicles)
+        # Position du véhicule retenu parmi les candidats de la mission
+        slot = np.argmax(cand[local_idx] == vehicle_idx[:, None], axis=1)
+        mission_idx = pending[local_idx]
+        assigned[mission_idx] = vehicle_idx
+        out_risk[mission_idx] = risk[local_idx, slot]
+        out_utilization[mission_idx] = utilization[local_idx, slot]
+        out_cost[mission_idx] = pair_cost[local_idx, slot]
+        free[vehicle_idx] = False
+        pending = pending[assigned[pending] < 0]
+
+    result = pd.DataFrame({
+        'mission_index': np.arange(n_missions),
+        'vehicle_index': assigned,
+        'risk': out_risk,
+        'Load_Utilization': out_utilization,
+        'cost': out_cost,
+    })
+    if 'Vehicle_ID' in vehicles.columns:
+        ids = vehicles['Vehicle_ID'].to_numpy()
+        result['Vehicle_ID'] = [ids[v] if v >= 0 else None for v in assigned]
+    if 'Mission_ID' in missions.columns:
+        result.insert(0, 'Mission_ID', missions['Mission_ID'].to_numpy())
+    return result
@@ -0,0 +1,278 @@
+"""Point d'entrée en ligne de commande : python -m src <commande>.
+
+    python -m src train maintenance [--profile latency] [--no-export] [--streaming]
+    python -m src export maintenance --profile auto
+    python -m src score maintenance lot.csv --output predictions.csv [--check-drift]
+    python -m src inspect maintenance
+
+Chaque commande n'importe que ce dont elle a besoin (inspect : bibliothèque
+standard uniquement ; score : pandas + onnxruntime ; skl2onnx/onnx ne sont
+chargés que par train/export). --timings affiche le temps de démarrage à froid
+de la commande et le compare à son budget.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+_START = time.perf_counter()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(REPO_ROOT, "models")
+
+MODELS = {
+    "maintenance": {
+        "module": "train_maintenance",
+        "train": "train_maintenance_model",
+        "loader": "load_maintenance_data",
+        # Le loader remplit les manquants par la médiane : à faire après le moniteur
+        "fill_missing": True,
+        "data": os.path.join(REPO_ROOT, "data", "vehicle_maintenance_data.csv"),
+    },
+    "co2": {
+        "module": "train_co2",
+        "train": "train_co2_model",
+        "loader": "load_co2_data",
+        "data": os.path.join(REPO_ROOT, "data", "CO2 Emissions_Canada.csv"),
+    },
+    "logistics": {
+        "module": "train_logistics",
+        "train": "train_logistics_model",
+        "loader": "load_logistics_data",
+        "data": os.path.join(REPO_ROOT, "data", "logistics_dataset_with_maintenance_required.csv"),
+    },
+}
+
+PROFILE_CHOICES = ["accuracy", "latency", "compressed", "auto"]
+
+# Budgets de démarrage à froid (ms) : imports + chargement des artefacts
+COLD_START_BUDGET_MS = {
+    "train": 5000,
+    "export": 5000,
+    "score": 1500,
+    "inspect": 100,
+}
+
+
+class Timer:
+    """Chronomètre par phase d'une commande (imports, chargement, exécution).
+
+    Le démarrage à froid court du chargement de ce module au début de la
+    phase "run", c'est-à-dire avant tout travail utile de la commande.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.run_started = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        if name == "run":
+            self.run_started = start
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def cold_start_ms(self):
+        end = self.run_started if self.run_started is not None else time.perf_counter()
+        return (end - _START) * 1000
+
+
+def _artifact(name, suffix):
+    return os.path.join(MODEL_DIR, f"{name}_{suffix}")
+
+
+def _load_metadata(name):
+    with open(_artifact(name, "metadata.json"), 'r') as f:
+        return json.load(f)
+
+
+def _probabilities_format(session):
+    """Format réel de la sortie probabilités d'une session : "zipmap", "tensor" ou None."""
+    outputs = session.get_outputs()
+    if len(outputs) < 2:
+        return None
+    return "zipmap" if outputs[1].type.startswith("seq(map") else "tensor"
+
+
+def cmd_train(args, timer):
+    with timer.phase("imports"):
+        import importlib
+        spec = MODELS[args.model]
+        module = importlib.import_module(f".{spec['module']}", __package__)
+    with timer.phase("run"):
+        data_path = args.data or spec["data"]
+        if not os.path.exists(data_path):
+            print("ERROR: Fichier " + data_path + " manquant.")
+            return 1
+        getattr(module, spec["train"])(data_path, profile=args.profile, export=not args.no_export,
+                                       streaming=args.streaming, model_dir=MODEL_DIR)
+    return 0
+
+
+def cmd_export(args, timer):
+    with timer.phase("imports"):
+        from .onnx_export import export_checkpoint
+    with timer.phase("run"):
+        checkpoint = _artifact(args.model, "model.joblib")
+        if not os.path.exists(checkpoint):
+            print(f"ERROR: {checkpoint} manquant : lancer d'abord 'train {args.model} --no-export'.")
+            return 1
+        export_checkpoint(checkpoint, _artifact(args.model, "model.onnx"),
+                          profile=args.profile, tolerance=args.tolerance,
+                          metadata_path=_artifact(args.model, "metadata.json"),
+                          baseline_path=_artifact(args.model, "baseline.json"))
+    return 0
+
+
+def cmd_score(args, timer):
+    with timer.phase("imports"):
+        import numpy as np
+        import onnxruntime as ort
+        from . import preprocessing
+    with timer.phase("load"):
+        metadata = _load_metadata(args.model)
+        if "scaler" not in metadata:
+            print(f"ERROR: metadonnees sans scaler : relancer 'train {args.model}' avant de scorer.")
+            return 1
+        session = ort.InferenceSession(_artifact(args.model, "model.onnx"),
+                                       providers=["CPUExecutionProvider"])
+        # Le format de sortie déclaré doit être celui du graphe livré (le profil auto peut changer)
+        declared = metadata.get("onnx_output")
+        actual = _probabilities_format(session)
+        if declared is None or declared["probabilities"] != actual:
+            print(f"ERROR: sortie ONNX '{actual}' non conforme a metadata.json ({declared}) : "
+                  f"relancer 'export {args.model}'.")
+            return 1
+    with timer.phase("run"):
+        spec = MODELS[args.model]
+        loader = getattr(preprocessing, spec["loader"])
+        if spec.get("fill_missing"):
+            # Le moniteur de dérive doit voir les valeurs manquantes du lot
+            raw, _ = loader(args.input, encode=False, fill=False)
+            X = preprocessing.apply_metadata(preprocessing.fill_missing(raw), metadata)
+        else:
+            raw, _ = loader(args.input, encode=False)
+            X = preprocessing.apply_metadata(raw, metadata)
+        outputs = session.run(None, {session.get_inputs()[0].name: X})
+
+        result = raw[[c for c in ('Vehicle_ID',) if c in raw.columns]].copy()
+        result['prediction'] = np.asarray(outputs[0]).ravel()
+        if len(outputs) > 1:
+            probs = outputs[1]
+            # Sortie ZipMap (profil accuracy) ou tenseur brut (latency/compressed)
+            result['probability'] = ([row[1] for row in probs] if isinstance(probs, list)
+                                     else np.asarray(probs)[:, 1])
+        if args.output:
+            result.to_csv(args.output, index=False)
+            print(f"SUCCESS: {len(result)} predictions ecrites dans {args.output}")
+        else:
+            print(result.to_string(index=False))
+
+        baseline = _artifact(args.model, "baseline.json")
+        if args.check_drift:
+            if not os.path.exists(baseline):
+                # Vérification demandée explicitement : ne pas conclure à l'absence de dérive
+                print(f"ERROR: profil de reference {baseline} manquant : relancer 'train {args.model}' "
+                      "pour activer --check-drift.")
+                return 1
+            from .drift_monitor import DriftMonitor
+            alerts = DriftMonitor.from_file(baseline).update(raw).check()
+            for alert in alerts:
+                print(f"WARNING: derive {alert['kind']} sur {alert['feature']} : "
+                      f"{alert['value']:.4f} (seuil {alert['threshold']:.4f})")
+            if not alerts:
+                print("Aucune derive detectee.")
+    return 0
+
+
+def cmd_inspect(args, timer):
+    with timer.phase("load"):
+        metadata = _load_metadata(args.model)
+        report_path = _artifact(args.model, "model_report.json")
+        report = None
+        if os.path.exists(report_path):
+            with open(report_path, 'r') as f:
+                report = json.load(f)
+    with timer.phase("run"):
+        onnx_path = _artifact(args.model, "model.onnx")
+        print(f"Modele     : {args.model}")
+        if os.path.exists(onnx_path):
+            print(f"ONNX       : {onnx_path} ({os.path.getsize(onnx_path) / 1024:.1f} Ko)")
+        else:
+            print(f"ONNX       : absent ({onnx_path})")
+        if report is not None:
+            print(f"Profil     : {report['selected']}")
+        output = metadata.get("onnx_output")
+        if output is None:
+            print("Sortie     : non declaree (re-exporter)")
+        else:
+            print(f"Sortie     : {output['probabilities'] or 'valeur (regression)'}")
+        print(f"Scaler     : {'oui' if 'scaler' in metadata else 'non (re-entrainer avant score)'}")
+        print(f"Features ({len(metadata['features'])}) :")
+        for i, feature in enumerate(metadata["features"]):
+            mapping = metadata["mappings"].get(feature)
+            suffix = f"  {mapping}" if mapping else ""
+            print(f"  {i:>3} {feature}{suffix}")
+    return 0
+
+
+COMMANDS = {
+    "train": cmd_train,
+    "export": cmd_export,
+    "score": cmd_score,
+    "inspect": cmd_inspect,
+}
+
+
+def build_parser():
+    # Option commune à toutes les sous-commandes
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--timings", action="store_true",
+                        help="afficher le temps de demarrage a froid de la commande")
+
+    parser = argparse.ArgumentParser(prog="python -m src", description="FleetOpti ML")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train", parents=[common], help="entrainer un modele (et l'exporter en ONNX)")
+    p.add_argument("model", choices=MODELS)
+    p.add_argument("--data", help="CSV d'entrainement (defaut : data/)")
+    p.add_argument("--profile", choices=PROFILE_CHOICES, default="accuracy")
+    p.add_argument("--no-export", action="store_true", help="sauvegarder seulement l'estimateur")
+    p.add_argument("--streaming", action="store_true",
+                   help="split hors memoire en un seul passage (hash de la cle, reservoirs par classe)")
+
+    p = sub.add_parser("export", parents=[common], help="re-exporter en ONNX un modele deja entraine")
+    p.add_argument("model", choices=MODELS)
+    p.add_argument("--profile", choices=PROFILE_CHOICES, default="accuracy")
+    p.add_argument("--tolerance", type=float, default=1e-3)
+
+    p = sub.add_parser("score", parents=[common], help="scorer un lot CSV avec le modele ONNX")
+    p.add_argument("model", choices=MODELS)
+    p.add_argument("input", help="CSV brut (avant encodage)")
+    p.add_argument("--output", help="CSV de sortie (defaut : affichage)")
+    p.add_argument("--check-drift", action="store_true", help="comparer le lot au profil de reference")
+
+    p = sub.add_parser("inspect", parents=[common], help="afficher les metadonnees d'un modele exporte")
+    p.add_argument("model", choices=MODELS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    timer = Timer()
+    status = COMMANDS[args.command](args, timer)
+
+    if args.timings:
+        budget = COLD_START_BUDGET_MS[args.command]
+        phases = ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timer.phases.items())
+        print(f"[timings] {args.command} : demarrage a froid {timer.cold_start_ms:.0f}ms "
+              f"(budget {budget}ms) ; {phases}", file=sys.stderr)
+        if timer.cold_start_ms > budget:
+            print(f"WARNING: budget de demarrage depasse pour '{args.command}'", file=sys.stderr)
+    return status
@@ -0,0 +1,446 @@
+"""Surveillance en continu de la dérive et de la qualité des données de scoring.
+
+Le profil de référence est calculé à l'export (voir export_baseline_profile) et
+sauvegardé à côté du modèle. En production, DriftMonitor accumule des
+statistiques fusionnables par feature, lot après lot, en mémoire constante :
+- numériques : effectif, valeurs manquantes, moyenne/variance (Welford/Chan),
+  min/max, histogramme sur les bornes de déciles du profil (PSI) et sketch de
+  quantiles à erreur relative bornée (DDSketch, voir QuantileSketch) ;
+- catégorielles : fréquences des modalités connues, effectif et exemples
+  (bornés) des modalités jamais vues à l'entraînement.
+Les moniteurs de plusieurs workers se combinent avec merge().
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .preprocessing import MISSING_LABEL
+
+N_BINS = 10
+MAX_UNSEEN_EXAMPLES = 20
+
+# Précision relative des quantiles : |estimé - exact| <= SKETCH_ALPHA * |exact|
+SKETCH_ALPHA = 0.01
+# En dessous, une valeur est comptée comme zéro (le logarithme n'est pas défini en 0)
+SKETCH_MIN_VALUE = 1e-9
+
+# Seuils d'alerte par défaut
+PSI_THRESHOLD = 0.2
+MISSING_RATE_DELTA = 0.05
+UNSEEN_RATE_THRESHOLD = 0.01
+MEAN_SHIFT_THRESHOLD = 0.5  # écart de moyenne exprimé en écarts-types de référence
+
+
+class QuantileSketch:
+    """Sketch de quantiles fusionnable (DDSketch, Masson et al. 2019).
+
+    Chaque valeur v != 0 tombe dans le seau ceil(log_gamma |v|), avec
+    gamma = (1 + alpha) / (1 - alpha) : tout quantile renvoyé est à moins de
+    alpha (en relatif) d'une valeur de l'échantillon du bon rang. La fusion est
+    exacte (somme des seaux) ; le nombre de seaux croît avec log(max / min),
+    soit quelques centaines pour alpha = 1 % sur la plupart des features.
+    """
+
+    def __init__(self, alpha=SKETCH_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+
+    @property
+    def count(self):
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zero
+
+    def _add(self, store, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / np.log(self.gamma)), return_counts=True)
+        for key, n in zip(keys.astype(int).tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + n
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.zero += int(np.sum(np.abs(values) < SKETCH_MIN_VALUE))
+        if np.any(values >= SKETCH_MIN_VALUE):
+            self._add(self.positive, values[values >= SKETCH_MIN_VALUE])
+        if np.any(values <= -SKETCH_MIN_VALUE):
+            self._add(self.negative, -values[values <= -SKETCH_MIN_VALUE])
+        return self
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in other_store.items():
+                store[key] = store.get(key, 0) + n
+        self.zero += other.zero
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        total = self.count
+        if total == 0:
+            return float('nan')
+        rank = q * (total - 1)
+        seen = 0
+        # Ordre croissant : négatifs du plus grand |v| au plus petit, zéros, positifs
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def histogram(self, edges):
+        """Comptages par intervalle de edges, chaque seau étant placé à sa valeur représentative."""
+        keys = [(-self._value(k), n) for k, n in self.negative.items()] + [(0.0, self.zero)]
+        keys += [(self._value(k), n) for k, n in self.positive.items()]
+        values, counts = np.array(keys).T
+        return np.bincount(np.searchsorted(edges, values, side='right'), weights=counts,
+                           minlength=len(edges) + 1).astype(np.int64)
+
+    def to_dict(self):
+        return {
+            "alpha": self.alpha, "zero": self.zero,
+            "positive": {str(k): n for k, n in self.positive.items()},
+            "negative": {str(k): n for k, n in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(d["alpha"])
+        sketch.zero = d["zero"]
+        sketch.positive = {int(k): int(n) for k, n in d["positive"].items()}
+        sketch.negative = {int(k): int(n) for k, n in d["negative"].items()}
+        return sketch
+
+
+class NumericStats:
+    """Statistiques numériques fusionnables sur des bornes d'histogramme figées."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.hist = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+        present = values[~np.isnan(values)]
+        self.missing += int(values.size - present.size)
+        if present.size == 0:
+            return self
+        batch = NumericStats(self.edges)
+        batch.count = int(present.size)
+        batch.mean = float(present.mean())
+        batch.m2 = float(((present - batch.mean) ** 2).sum())
+        batch.min = float(present.min())
+        batch.max = float(present.max())
+        batch.hist = np.bincount(np.searchsorted(self.edges, present, side='right'),
+                                 minlength=len(self.edges) + 1)
+        batch.sketch.update(present)
+        return self._merge_moments(batch)
+
+    def _merge_moments(self, other):
+        # Combinaison parallèle de Chan et al. pour moyenne et variance
+        total = self.count + other.count
+        if total == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist = self.hist + other.hist
+        self.sketch.merge(other.sketch)
+        return self
+
+    def merge(self, other):
+        self.missing += other.missing
+        return self._merge_moments(other)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def missing_rate(self):
+        total = self.count + self.missing
+        return self.missing / total if total else 0.0
+
+    def quantile(self, q):
+        """Quantile à SKETCH_ALPHA près (relatif), borné par le min/max observés."""
+        if self.count == 0:
+            return float('nan')
+        return float(np.clip(self.sketch.quantile(q), self.min, self.max))
+
+    def to_dict(self):
+        return {
+            "type": "numeric", "edges": self.edges.tolist(), "count": self.count,
+            "missing": self.missing, "mean": self.mean, "m2": self.m2,
+            "min": self.min if self.count else None, "max": self.max if self.count else None,
+            "hist": self.hist.tolist(), "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        stats = cls(d["edges"])
+        stats.count, stats.missing = d["count"], d["missing"]
+        stats.mean, stats.m2 = d["mean"], d["m2"]
+        stats.min = d["min"] if d["min"] is not None else np.inf
+        stats.max = d["max"] if d["max"] is not None else -np.inf
+        stats.hist = np.asarray(d["hist"], dtype=np.int64)
+        stats.sketch = QuantileSketch.from_dict(d["sketch"])
+        return stats
+
+
+class CategoricalStats:
+    """Fréquences des modalités connues + comptage des modalités inédites."""
+
+    def __init__(self, categories):
+        self.categories = [str(c) for c in categories]
+        self.counts = {c: 0 for c in self.categories}
+        self.unseen = 0
+        self.unseen_examples = []
+        self.missing = 0
+
+    def update(self, values):
+        values = pd.Series(values)
+        self.missing += int(values.isna().sum())
+        counts = values.dropna().astype(str).value_counts()
+        for value, n in counts.items():
+            if value in self.counts:
+                self.counts[value] += int(n)
+            else:
+                self._add_unseen(value, int(n))
+        return self
+
+    def _add_unseen(self, value, n):
+        self.unseen += n
+        if value not in self.unseen_examples and len(self.unseen_examples) < MAX_UNSEEN_EXAMPLES:
+            self.unseen_examples.append(value)
+
+    def merge(self, other):
+        for value, n in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + n
+        self.unseen += other.unseen
+        for value in other.unseen_examples:
+            if value not in self.unseen_examples and len(self.unseen_examples) < MAX_UNSEEN_EXAMPLES:
+                self.unseen_examples.append(value)
+        self.missing += other.missing
+        return self
+
+    @property
+    def count(self):
+        return sum(self.counts.values()) + self.unseen
+
+    @property
+    def missing_rate(self):
+        total = self.count + self.missing
+        return self.missing / total if total else 0.0
+
+    @property
+    def unseen_rate(self):
+        return self.unseen / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {
+            "type": "categorical", "categories": self.categories, "counts": self.counts,
+            "unseen": self.unseen, "unseen_examples": self.unseen_examples, "missing": self.missing,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        stats = cls(d["categories"])
+        stats.counts = {str(k): int(v) for k, v in d["counts"].items()}
+        stats.unseen, stats.missing = d["unseen"], d["missing"]
+        stats.unseen_examples = list(d["unseen_examples"])
+        return stats
+
+
+def _stats_from_dict(d):
+    return NumericStats.from_dict(d) if d["type"] == "numeric" else CategoricalStats.from_dict(d)
+
+
+def population_stability_index(expected, actual, eps=1e-6):
+    """PSI entre deux distributions de comptages sur les mêmes classes."""
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    p = np.clip(expected / expected.sum(), eps, None)
+    q = np.clip(actual / actual.sum(), eps, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def build_baseline_profile(df, features, encoders=None):
+    """Profil de référence calculé sur les données d'entraînement.
+
+    df doit être pris avant remplissage des valeurs manquantes : sinon le taux
+    de manquants de référence est nul par construction. Les colonnes présentes
+    dans encoders sont profilées en modalités d'origine (les valeurs encodées
+    sont retraduites via le LabelEncoder).
+    """
+    encoders = encoders or {}
+    profile = {}
+    for col in features:
+        if col in encoders:
+            classes = encoders[col].classes_
+            stats = CategoricalStats(classes)
+            # La modalité 'nan' des encoders redevient un manquant, comme dans les lots bruts
+            labels = pd.Series(classes[df[col].to_numpy(dtype=int)])
+            stats.update(labels.where(labels != MISSING_LABEL))
+        else:
+            values = pd.to_numeric(df[col], errors='coerce').dropna().to_numpy(dtype=np.float64)
+            quantiles = np.linspace(0, 1, N_BINS + 1)[1:-1]
+            edges = np.unique(np.quantile(values, quantiles)) if values.size else []
+            stats = NumericStats(edges)
+            stats.update(df[col])
+        profile[col] = stats.to_dict()
+    return profile
+
+
+def build_baseline_from_stats(features, numeric_stats, category_counts, encoders=None):
+    """Profil de référence à partir de statistiques cumulées en flux, sans second passage.
+
+    numeric_stats : NumericStats par feature numérique (valeurs avant remplissage) ;
+    category_counts : fréquences des modalités d'origine par feature catégorielle.
+    Les bornes de déciles et leur histogramme sont lus dans le sketch : une valeur
+    à moins de SKETCH_ALPHA (relatif) d'une borne peut tomber dans le décile voisin.
+    """
+    encoders = encoders or {}
+    profile = {}
+    for col in features:
+        if col in encoders:
+            stats = CategoricalStats(encoders[col].classes_)
+            for value, n in category_counts[col].items():
+                if value == MISSING_LABEL:
+                    stats.missing += int(n)
+                else:
+                    stats.counts[str(value)] += int(n)
+        else:
+            streamed = numeric_stats[col]
+            quantiles = np.linspace(0, 1, N_BINS + 1)[1:-1]
+            edges = np.unique([streamed.quantile(q) for q in quantiles]) if streamed.count else []
+            stats = NumericStats.from_dict({**streamed.to_dict(), "edges": list(edges),
+                                            "hist": streamed.sketch.histogram(edges).tolist()})
+        profile[col] = stats.to_dict()
+    return profile
+
+
+def export_baseline_profile(df, features, encoders, output_path):
+    """Sauvegarde le profil de référence à côté du modèle exporté."""
+    save_baseline_profile(build_baseline_profile(df, features, encoders), output_path)
+
+
+def save_baseline_profile(profile, output_path):
+    """Écrit un profil déjà construit (voir build_baseline_from_stats)."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(profile, f, indent=4)
+    print(f"SUCCESS: Profil de reference exporte vers {output_path}")
+
+
+class DriftMonitor:
+    """Accumule les lots de scoring et les compare au profil de référence."""
+
+    def __init__(self, baseline):
+        self.baseline = {col: _stats_from_dict(d) for col, d in baseline.items()}
+        self.reset()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_state(cls, baseline, state):
+        """Recharge un moniteur sérialisé par to_dict() (ex. état d'un autre worker)."""
+        monitor = cls(baseline)
+        monitor.stats = {col: _stats_from_dict(d) for col, d in state.items()}
+        return monitor
+
+    def reset(self):
+        """Repart de statistiques vides, sur les mêmes bornes que la référence."""
+        self.stats = {}
+        for col, ref in self.baseline.items():
+            if isinstance(ref, NumericStats):
+                self.stats[col] = NumericStats(ref.edges)
+            else:
+                self.stats[col] = CategoricalStats(ref.categories)
+
+    def update(self, batch):
+        """Ajoute un lot (DataFrame brut, avant encodage) aux statistiques courantes."""
+        for col, stats in self.stats.items():
+            if col in batch.columns:
+                stats.update(batch[col])
+            else:
+                # Colonne absente du lot : entièrement manquante
+                stats.missing += len(batch)
+        return self
+
+    def merge(self, other):
+        for col, stats in self.stats.items():
+            stats.merge(other.stats[col])
+        return self
+
+    def check(self, psi_threshold=PSI_THRESHOLD, missing_delta=MISSING_RATE_DELTA,
+              unseen_threshold=UNSEEN_RATE_THRESHOLD, mean_shift_threshold=MEAN_SHIFT_THRESHOLD):
+        """Liste des alertes de dérive / qualité sur les statistiques accumulées."""
+        alerts = []
+
+        def alert(col, kind, value, threshold):
+            alerts.append({"feature": col, "kind": kind, "value": value, "threshold": threshold})
+
+        for col, stats in self.stats.items():
+            ref = self.baseline[col]
+            if stats.count + stats.missing == 0:
+                continue
+            if stats.missing_rate - ref.missing_rate > missing_delta:
+                alert(col, "missing_rate", stats.missing_rate, ref.missing_rate + missing_delta)
+
+            if isinstance(stats, NumericStats):
+                psi = population_stability_index(ref.hist, stats.hist)
+                std = np.sqrt(ref.variance)
+                shift = abs(stats.mean - ref.mean) / std if std > 0 else 0.0
+                if stats.count and shift > mean_shift_threshold:
+                    alert(col, "mean_shift", shift, mean_shift_threshold)
+            else:
+                expected = [ref.counts[c] for c in ref.categories] + [ref.unseen]
+                actual = [stats.counts[c] for c in ref.categories] + [stats.unseen]
+                psi = population_stability_index(expected, actual)
+                if stats.unseen_rate > unseen_threshold:
+                    alert(col, "unseen_categories", stats.unseen_rate, unseen_threshold)
+            if psi > psi_threshold:
+                alert(col, "psi", psi, psi_threshold)
+        return alerts
+
+    def summary(self):
+        """Statistiques courantes par feature (pour journalisation)."""
+        rows = {}
+        for col, stats in self.stats.items():
+            if isinstance(stats, NumericStats):
+                rows[col] = {"count": stats.count, "missing_rate": stats.missing_rate,
+                             "mean": stats.mean, "std": float(np.sqrt(stats.variance)),
+                             "p50": stats.quantile(0.5), "p95": stats.quantile(0.95)}
+            else:
+                rows[col] = {"count": stats.count, "missing_rate": stats.missing_rate,
+                             "unseen_rate": stats.unseen_rate,
+                             "unseen_examples": stats.unseen_examples}
+        return pd.DataFrame(rows).T
+
+    def to_dict(self):
+        return {col: stats.to_dict() for col, stats in self.stats.items()}
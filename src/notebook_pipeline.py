@@ -0,0 +1,204 @@
+"""Pipeline de rafraîchissement des notebooks : incrémental et parallèle.
+
+Usage :
+    python -m src.notebook_pipeline              # exécute uniquement les notebooks obsolètes
+    python -m src.notebook_pipeline --force      # ré-exécute tout
+    python -m src.notebook_pipeline --dry-run    # liste ce qui serait exécuté
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .preprocessing import DATA_CACHE_ENV, read_csv_cached
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOTEBOOK_DIR = os.path.join(REPO_ROOT, "notebooks")
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "data")
+MANIFEST_PATH = os.path.join(REPO_ROOT, ".cache", "notebooks_manifest.json")
+
+# Chemins de CSV référencés dans les cellules ('../data/xxx.csv')
+DATA_REF_PATTERN = re.compile(r"""data/([^'"\n]+?\.csv)""")
+# Modules importés (import x / from x import / from .x import)
+IMPORT_PATTERN = re.compile(r"^\s*(?:from\s+\.?(\w+)|import\s+(\w+))", re.MULTILINE)
+
+
+def discover_notebooks(notebook_dir=NOTEBOOK_DIR):
+    """Liste les notebooks du dépôt (hors checkpoints Jupyter)."""
+    notebooks = []
+    for name in sorted(os.listdir(notebook_dir)):
+        if name.endswith(".ipynb") and not name.startswith("."):
+            notebooks.append(os.path.join(notebook_dir, name))
+    return notebooks
+
+
+def _hash_file(path, h):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def _code_sources(nb):
+    return ["".join(cell.get("source", [])) for cell in nb.get("cells", [])
+            if cell.get("cell_type") == "code"]
+
+
+def _src_imports(source):
+    """Modules de src/ importés par un bout de code."""
+    modules = set()
+    for match in IMPORT_PATTERN.finditer(source):
+        name = match.group(1) or match.group(2)
+        if os.path.exists(os.path.join(SRC_DIR, f"{name}.py")):
+            modules.add(name)
+    return modules
+
+
+def src_dependencies(source):
+    """Fermeture transitive des modules de src/ dont dépend un bout de code."""
+    pending, seen = list(_src_imports(source)), set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(SRC_DIR, f"{name}.py"), "r", encoding="utf-8") as f:
+            pending.extend(_src_imports(f.read()) - seen)
+    return seen
+
+
+def notebook_inputs(nb):
+    """Fichiers dont dépend un notebook : CSV référencés + modules de src/ importés."""
+    inputs = set()
+    for source in _code_sources(nb):
+        for rel in DATA_REF_PATTERN.findall(source):
+            path = os.path.join(REPO_ROOT, "data", rel)
+            if os.path.exists(path):
+                inputs.add(path)
+    for name in src_dependencies("\n".join(_code_sources(nb))):
+        inputs.add(os.path.join(SRC_DIR, f"{name}.py"))
+    return sorted(inputs)
+
+
+def notebook_fingerprint(nb_path):
+    """Hash du code (sans les sorties) et du contenu des entrées du notebook."""
+    with open(nb_path, "r", encoding="utf-8") as f:
+        nb = json.load(f)
+    h = hashlib.sha256()
+    for source in _code_sources(nb):
+        h.update(source.encode("utf-8"))
+        h.update(b"\0")
+    for path in notebook_inputs(nb):
+        h.update(os.path.relpath(path, REPO_ROOT).encode("utf-8"))
+        _hash_file(path, h)
+    return h.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+
+def stale_notebooks(notebooks, manifest, force=False):
+    """Retourne [(chemin, empreinte)] des notebooks à ré-exécuter."""
+    stale = []
+    for nb_path in notebooks:
+        fingerprint = notebook_fingerprint(nb_path)
+        key = os.path.relpath(nb_path, REPO_ROOT)
+        if force or manifest.get(key) != fingerprint:
+            stale.append((nb_path, fingerprint))
+    return stale
+
+
+def preload_datasets(csv_paths, cache_dir=DEFAULT_CACHE_DIR):
+    """Parse chaque CSV une seule fois et le dépose dans le cache partagé."""
+    for path in sorted(csv_paths):
+        read_csv_cached(path, cache_dir=cache_dir)
+
+
+def stale_datasets(stale):
+    """CSV référencés par les notebooks à ré-exécuter (union de leurs entrées)."""
+    paths = set()
+    for nb_path, _ in stale:
+        with open(nb_path, "r", encoding="utf-8") as f:
+            nb = json.load(f)
+        paths.update(p for p in notebook_inputs(nb) if p.endswith(".csv"))
+    return paths
+
+
+def execute_notebook(nb_path, timeout=600, kernel_name="python3"):
+    """Exécute un notebook en place (cwd = dossier du notebook)."""
+    # Import local : nbclient/nbformat ne sont nécessaires que pour l'exécution
+    import nbformat
+    from nbclient import NotebookClient
+
+    start = time.time()
+    nb = nbformat.read(nb_path, as_version=4)
+    client = NotebookClient(nb, timeout=timeout, kernel_name=kernel_name,
+                            resources={"metadata": {"path": os.path.dirname(nb_path)}})
+    client.execute()
+    nbformat.write(nb, nb_path)
+    return time.time() - start
+
+
+def run_pipeline(force=False, jobs=None, timeout=600, dry_run=False, cache_dir=DEFAULT_CACHE_DIR):
+    """Rafraîchit les notebooks obsolètes ; renvoie le nombre d'échecs."""
+    notebooks = discover_notebooks()
+    manifest = load_manifest()
+    stale = stale_notebooks(notebooks, manifest, force=force)
+
+    print(f"{len(stale)}/{len(notebooks)} notebook(s) a re-executer")
+    for nb_path, _ in stale:
+        print(f"  - {os.path.relpath(nb_path, REPO_ROOT)}")
+    if dry_run or not stale:
+        return 0
+
+    # Les kernels héritent de l'environnement : ils liront les pickles au lieu des CSV
+    os.environ[DATA_CACHE_ENV] = cache_dir
+    preload_datasets(stale_datasets(stale), cache_dir)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(execute_notebook, nb_path, timeout): (nb_path, fingerprint)
+                   for nb_path, fingerprint in stale}
+        for future in as_completed(futures):
+            nb_path, fingerprint = futures[future]
+            key = os.path.relpath(nb_path, REPO_ROOT)
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"ERROR: {key} : {e}")
+                continue
+            # Les sorties ne font pas partie de l'empreinte : celle calculée avant reste valide
+            manifest[key] = fingerprint
+            save_manifest(manifest)
+            print(f"SUCCESS: {key} ({elapsed:.1f}s)")
+
+    if failures:
+        print(f"ERROR: {failures} notebook(s) en echec")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rafraichit les notebooks obsoletes en parallele.")
+    parser.add_argument("--force", action="store_true", help="re-executer tous les notebooks")
+    parser.add_argument("--jobs", type=int, default=None, help="nombre de processus (defaut : nb de CPU)")
+    parser.add_argument("--timeout", type=int, default=600, help="timeout par cellule en secondes")
+    parser.add_argument("--dry-run", action="store_true", help="lister les notebooks obsoletes sans les executer")
+    args = parser.parse_args()
+    failures = run_pipeline(force=args.force, jobs=args.jobs, timeout=args.timeout, dry_run=args.dry_run)
+    # Code de sortie non nul pour que la CI détecte un rafraîchissement en échec
+    sys.exit(1 if failures else 0)
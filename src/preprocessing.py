@@ -1,96 +1,209 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+import hashlib
 import json
 import os
 
-def load_maintenance_data(file_path, encode=True):
-    """Prépare les données pour la maintenance prédictive."""
+# Dossier de cache partagé (pickles des CSV bruts), activé par le pipeline de notebooks
+DATA_CACHE_ENV = "FLEETOPTI_DATA_CACHE"
+
+def _cache_file(file_path, cache_dir):
+    """Chemin du pickle associé à un CSV, invalidé dès que le fichier change."""
+    st = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(file_path))[0].replace(' ', '_')
+    return os.path.join(cache_dir, f"{name}-{digest}.pkl")
+
+def read_csv_cached(file_path, cache_dir=None):
+    """Lit un CSV brut en passant par le cache partagé s'il est configuré."""
+    cache_dir = cache_dir or os.environ.get(DATA_CACHE_ENV)
+    if not cache_dir:
+        return pd.read_csv(file_path)
+
+    cached = _cache_file(file_path, cache_dir)
+    if os.path.exists(cached):
+        return pd.read_pickle(cached)
+
     df = pd.read_csv(file_path)
-    le_dict = {}
+    os.makedirs(cache_dir, exist_ok=True)
+    # Écriture atomique : plusieurs kernels peuvent remplir le cache en parallèle
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    df.to_pickle(tmp)
+    os.replace(tmp, cached)
+    return df
 
-    # Gestion des dates
+# Colonnes textuelles encodées par LabelEncoder, par jeu de données
+MAINTENANCE_CATEGORICAL = ['Vehicle_Model', 'Maintenance_History', 'Fuel_Type',
+                           'Transmission_Type', 'Owner_Type', 'Tire_Condition',
+                           'Brake_Condition', 'Battery_Status', 'Vehicle_Type']
+CO2_CATEGORICAL = ['Make', 'Model', 'Vehicle Class', 'Transmission', 'Fuel Type']
+LOGISTICS_CATEGORICAL = ['Weather_Conditions', 'Road_Conditions', 'Vehicle_Type', 'Maintenance_History']
+
+# Modalité des valeurs manquantes (str(nan), celle des LabelEncoder sur astype(str) avant pandas 3)
+MISSING_LABEL = 'nan'
+
+def category_labels(values):
+    """Modalités en texte, valeurs manquantes comprises (MISSING_LABEL).
+
+    Depuis pandas 3, astype(str) conserve les NaN : ils sont remplacés
+    explicitement pour que entraînement, split en flux et scoring encodent la
+    même modalité.
+    """
+    values = pd.Series(values)
+    return values.astype(object).where(values.notna(), MISSING_LABEL).astype(str)
+
+def maintenance_features(df, now=None):
+    """Conversion des dates en deltas temporels (utilisable ligne à ligne / par chunk)."""
+    now = now if now is not None else pd.Timestamp.now()
     if 'Last_Service_Date' in df.columns:
         df['Last_Service_Date'] = pd.to_datetime(df['Last_Service_Date'], errors='coerce')
-        df['Days_Since_Service'] = (pd.Timestamp.now() - df['Last_Service_Date']).dt.days
+        df['Days_Since_Service'] = (now - df['Last_Service_Date']).dt.days
         df = df.drop(columns=['Last_Service_Date'])
     
     if 'Warranty_Expiry_Date' in df.columns:
         df['Warranty_Expiry_Date'] = pd.to_datetime(df['Warranty_Expiry_Date'], errors='coerce')
-        df['Days_Until_Expiry'] = (df['Warranty_Expiry_Date'] - pd.Timestamp.now()).dt.days
+        df['Days_Until_Expiry'] = (df['Warranty_Expiry_Date'] - now).dt.days
         df = df.drop(columns=['Warranty_Expiry_Date'])
+    return df
+
+def logistics_features(df):
+    """Feature engineering logistique : ratio de charge."""
+    if 'Actual_Load' in df.columns and 'Load_Capacity' in df.columns:
+        df['Load_Utilization'] = df['Actual_Load'] / df['Load_Capacity']
+    return df
+
+def fill_missing(df):
+    """Remplit les valeurs numériques manquantes par la médiane de chaque colonne."""
+    return df.fillna(df.median(numeric_only=True))
+
+def load_maintenance_data(file_path, encode=True, fill=True):
+    """Prépare les données pour la maintenance prédictive.
+
+    fill=False conserve les valeurs manquantes (profil de dérive, moniteur).
+    """
+    df = read_csv_cached(file_path)
+    le_dict = {}
+
+    # Gestion des dates
+    df = maintenance_features(df)
 
     if encode:
-        cat_cols = ['Vehicle_Model', 'Maintenance_History', 'Fuel_Type', 
-                    'Transmission_Type', 'Owner_Type', 'Tire_Condition', 
-                    'Brake_Condition', 'Battery_Status', 'Vehicle_Type']
-        for col in cat_cols:
+        from sklearn.preprocessing import LabelEncoder
+        for col in MAINTENANCE_CATEGORICAL:
             if col in df.columns:
                 le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
+                df[col] = le.fit_transform(category_labels(df[col]))
                 le_dict[col] = le
 
     # Remplissage des valeurs manquantes numériques
-    df = df.fillna(df.median(numeric_only=True))
+    if fill:
+        df = fill_missing(df)
     return df, le_dict
 
 def load_co2_data(file_path, encode=True):
     """Prépare les données pour le calcul carbone."""
-    df = pd.read_csv(file_path)
+    df = read_csv_cached(file_path)
     le_dict = {}
     if encode:
-        for col in ['Make', 'Model', 'Vehicle Class', 'Transmission', 'Fuel Type']:
+        from sklearn.preprocessing import LabelEncoder
+        for col in CO2_CATEGORICAL:
             if col in df.columns:
                 le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
+                df[col] = le.fit_transform(category_labels(df[col]))
                 le_dict[col] = le
     return df, le_dict
 
 def load_logistics_data(file_path, encode=True):
     """Prépare les données pour l'optimisation logistique."""
-    df = pd.read_csv(file_path)
+    df = read_csv_cached(file_path)
     # Feature engineering : Ratio de charge
-    if 'Actual_Load' in df.columns and 'Load_Capacity' in df.columns:
-        df['Load_Utilization'] = df['Actual_Load'] / df['Load_Capacity']
+    df = logistics_features(df)
     
     # Encodage des conditions
     le_dict = {}
     if encode:
-        for col in ['Weather_Conditions', 'Road_Conditions', 'Vehicle_Type', 'Maintenance_History']:
+        from sklearn.preprocessing import LabelEncoder
+        for col in LOGISTICS_CATEGORICAL:
             if col in df.columns:
                 le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
+                df[col] = le.fit_transform(category_labels(df[col]))
                 le_dict[col] = le
     return df, le_dict
 
 def load_telematics_data(file_path):
     """Prépare les données de télématique."""
-    df = pd.read_csv(file_path)
+    df = read_csv_cached(file_path)
     if 'timestamp' in df.columns:
         df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
     return df
 
-def export_metadata(encoders, features, output_path="models/metadata.json"):
-    """Exporte les mappings des encoders et l'ordre des colonnes pour Java."""
+def build_metadata(encoders, features, scaler=None):
+    """Mappings des encoders, ordre des colonnes et scaler, au format de metadata.json."""
     metadata = {
         "features": features,
         "mappings": {}
     }
     for col, le in encoders.items():
         metadata["mappings"][col] = {str(label): int(i) for i, label in enumerate(le.classes_)}
-    
+    # Le modèle ONNX attend des entrées standardisées : on exporte aussi le scaler
+    if scaler is not None:
+        metadata["scaler"] = {
+            "mean": [float(v) for v in scaler.mean_],
+            "scale": [float(v) for v in scaler.scale_],
+        }
+    return metadata
+
+def export_metadata(encoders, features, output_path="models/metadata.json", scaler=None):
+    """Exporte les mappings des encoders et l'ordre des colonnes pour Java."""
+    write_metadata(build_metadata(encoders, features, scaler), output_path)
+
+def write_metadata(metadata, output_path):
+    """Écrit un metadata.json déjà construit (voir build_metadata)."""
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w') as f:
         json.dump(metadata, f, indent=4)
     print(f"SUCCESS: Metadonnees exportees vers {output_path}")
 
+def standardize(X, metadata):
+    """Applique le scaler exporté dans metadata.json ; renvoie une matrice float32."""
+    scaler = metadata.get("scaler")
+    if scaler is None:
+        raise ValueError("metadata.json ne contient pas de 'scaler' : re-entrainer le modele "
+                         "(python -m src train ...) pour exporter les statistiques de standardisation.")
+    X = np.asarray(X, dtype=np.float64)
+    return ((X - np.asarray(scaler["mean"])) / np.asarray(scaler["scale"])).astype(np.float32)
+
+def apply_metadata(df, metadata):
+    """Encode un lot brut selon metadata.json ; renvoie la matrice float32 attendue par l'ONNX.
+
+    Les modalités inconnues sont encodées -1 ; le scaler exporté est obligatoire
+    (ValueError sinon : métadonnées antérieures à son export, re-entraîner).
+    """
+    columns = []
+    for col in metadata["features"]:
+        if col not in df.columns:
+            raise KeyError(f"Colonne manquante pour le scoring : {col}")
+        mapping = metadata["mappings"].get(col)
+        if mapping is not None:
+            values = category_labels(df[col]).map(mapping).fillna(-1)
+        else:
+            values = pd.to_numeric(df[col], errors='coerce')
+        columns.append(values.to_numpy(dtype=np.float64))
+    return standardize(np.column_stack(columns), metadata)
+
+# Identifiants connus qui ne sont pas des features
+ID_COLUMNS = ['Vehicle_ID', 'deviceId', 'timeMili', 'id', 'ID']
+
 def prepare_splits(df, target_col):
     """Split générique Train/Test avec retour de scaler et feature_names."""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
     y = df[target_col]
     X = df.drop(columns=[target_col], errors='ignore').select_dtypes(include=[np.number])
     # Supprimer les IDs connus qui ne sont pas des features
-    X = X.drop(columns=['Vehicle_ID', 'deviceId', 'timeMili', 'id', 'ID'], errors='ignore')
+    X = X.drop(columns=ID_COLUMNS, errors='ignore')
     
     feature_names = X.columns.tolist()
     
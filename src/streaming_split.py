@@ -0,0 +1,226 @@
+"""Split Train/Test hors mémoire et sans fuite, en un seul passage sur le CSV.
+
+- Affectation déterministe : chaque ligne part en test si le hash de sa clé
+  (Vehicle_ID par défaut) tombe sous test_size ; un même véhicule n'apparaît
+  donc jamais dans les deux ensembles, quel que soit l'ordre des chunks.
+  Sans identifiant stable, key_col=None (explicite) hache la ligne entière :
+  seuls les doublons exacts restent alors du même côté.
+- Échantillonnage : réservoirs bornés par classe de la cible (tout le
+  minoritaire est conservé jusqu'à sample_size), réservoir uniforme pour le test.
+- Scaler et profil de dérive : statistiques cumulées chunk par chunk sur toutes
+  les lignes de train, avant remplissage des manquants (catégorielles : à
+  partir des fréquences, une fois le vocabulaire connu).
+La mémoire utilisée dépend de sample_size et chunksize, pas de la taille du fichier.
+"""
+import collections
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from .drift_monitor import NumericStats, build_baseline_from_stats
+from .preprocessing import (CO2_CATEGORICAL, ID_COLUMNS, LOGISTICS_CATEGORICAL,
+                            MAINTENANCE_CATEGORICAL, category_labels, logistics_features,
+                            maintenance_features)
+
+DATASETS = {
+    "maintenance": {"transform": maintenance_features, "categorical": MAINTENANCE_CATEGORICAL},
+    "co2": {"transform": None, "categorical": CO2_CATEGORICAL},
+    "logistics": {"transform": logistics_features, "categorical": LOGISTICS_CATEGORICAL},
+}
+
+# Clé de hachage fixe (16 octets exigés par pandas) : l'affectation est reproductible
+HASH_KEY = "fleetopti-split0"
+
+StreamingSplit = collections.namedtuple("StreamingSplit", [
+    "X_train", "X_test", "y_train", "y_test", "scaler", "feature_names",
+    "encoders", "sample_weight", "baseline",
+])
+
+
+def hash_fraction(df, key_col=None, hash_key=HASH_KEY):
+    """Valeur stable dans [0, 1) par ligne, fonction de la clé (ou de la ligne entière)."""
+    data = df[key_col] if key_col else df
+    hashed = pd.util.hash_pandas_object(data.astype(str), index=False, hash_key=hash_key)
+    return hashed.to_numpy(dtype=np.uint64) / np.float64(2 ** 64)
+
+
+class Reservoir:
+    """Échantillon uniforme de taille bornée (bottom-k sur des priorités aléatoires)."""
+
+    def __init__(self, capacity, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.seen = 0
+        self.frame = None
+        self.priority = np.empty(0)
+
+    def update(self, chunk):
+        if chunk.empty:
+            return self
+        self.seen += len(chunk)
+        priority = self.rng.random(len(chunk))
+        # Réservoir plein : seules les lignes sous la pire priorité gardée peuvent entrer
+        if len(self.priority) == self.capacity:
+            keep = priority < self.priority.max()
+            chunk, priority = chunk[keep], priority[keep]
+            if chunk.empty:
+                return self
+        frame = chunk if self.frame is None else pd.concat([self.frame, chunk], ignore_index=True)
+        priority = np.concatenate([self.priority, priority])
+        if len(priority) > self.capacity:
+            keep = np.argpartition(priority, self.capacity - 1)[:self.capacity]
+            frame, priority = frame.iloc[keep], priority[keep]
+        self.frame, self.priority = frame.reset_index(drop=True), priority
+        return self
+
+
+def _append_csv(chunk, path):
+    chunk.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+
+def _build_scaler(feature_names, numeric_stats, train_categories, mappings):
+    """StandardScaler équivalent à un fit sur toutes les lignes de train."""
+    from sklearn.preprocessing import StandardScaler
+
+    mean, var, seen = [], [], []
+    for col in feature_names:
+        if col in mappings:
+            counts = train_categories[col]
+            codes = np.array([mappings[col][v] for v in counts], dtype=np.float64)
+            weights = np.array(list(counts.values()), dtype=np.float64)
+            n = weights.sum()
+            mu = float((codes * weights).sum() / n) if n else 0.0
+            mean.append(mu)
+            var.append(float((weights * (codes - mu) ** 2).sum() / n) if n else 0.0)
+            seen.append(n)
+        else:
+            stats = numeric_stats[col]
+            mean.append(stats.mean)
+            # StandardScaler utilise la variance de population (ddof=0)
+            var.append(stats.m2 / stats.count if stats.count else 0.0)
+            seen.append(stats.count)
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(mean)
+    scaler.var_ = np.asarray(var)
+    scale = np.sqrt(scaler.var_)
+    scaler.scale_ = np.where(scale == 0, 1.0, scale)
+    scaler.n_samples_seen_ = np.asarray(seen, dtype=np.int64)
+    scaler.n_features_in_ = len(feature_names)
+    return scaler
+
+
+def stream_splits(file_path, target_col, dataset, key_col='Vehicle_ID', test_size=0.2,
+                  chunksize=100_000, sample_size=100_000, stratify=True,
+                  output_dir=None, seed=42):
+    """Équivalent hors mémoire de load_*_data + prepare_splits.
+
+    Les lignes de train/test peuvent être écrites intégralement dans output_dir
+    (train.csv, test.csv) ; seuls les échantillons des réservoirs sont chargés
+    en mémoire et renvoyés prêts à l'entraînement. sample_weight corrige le
+    rééchantillonnage par classe (effectif réel / effectif échantillonné).
+    baseline est le profil de dérive des lignes de train (build_baseline_from_stats).
+    key_col doit exister dans le CSV ; key_col=None hache la ligne entière.
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    config = DATASETS[dataset]
+    rng = np.random.default_rng(seed)
+    transform = config["transform"]
+    if transform is maintenance_features:
+        # Même date de référence pour tous les chunks
+        transform = functools.partial(maintenance_features, now=pd.Timestamp.now())
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        for name in ("train.csv", "test.csv"):
+            if os.path.exists(os.path.join(output_dir, name)):
+                os.remove(os.path.join(output_dir, name))
+
+    feature_names, categorical, split_key = None, [], None
+    numeric_stats = {}
+    categories = collections.defaultdict(set)
+    train_categories = collections.defaultdict(collections.Counter)
+    train_reservoirs = {}
+    test_reservoir = Reservoir(sample_size, rng)
+
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        if transform is not None:
+            chunk = transform(chunk)
+        chunk = chunk[chunk[target_col].notna()]
+        if chunk.empty:
+            continue
+
+        if feature_names is None:
+            # Schéma figé sur le premier chunk, dans l'ordre de prepare_splits
+            if key_col is not None and key_col not in chunk.columns:
+                raise KeyError(f"Colonne de split {key_col} absente de {file_path} : "
+                               "passer key_col=None pour hacher la ligne entiere")
+            split_key = key_col
+            categorical = [c for c in config["categorical"] if c in chunk.columns]
+            feature_names = [c for c in chunk.columns
+                             if c != target_col and c != split_key and c not in ID_COLUMNS
+                             and (c in categorical or is_numeric_dtype(chunk[c]))]
+            numeric_stats = {c: NumericStats([]) for c in feature_names if c not in categorical}
+
+        is_test = hash_fraction(chunk, split_key) < test_size
+        train, test = chunk[~is_test], chunk[is_test]
+
+        for col in categorical:
+            # Manquants comptés comme modalité 'nan', comme les LabelEncoder de load_*_data
+            categories[col].update(category_labels(chunk[col]).unique())
+            train_categories[col].update(category_labels(train[col]).value_counts().to_dict())
+        for col, stats in numeric_stats.items():
+            stats.update(train[col])
+
+        if stratify:
+            for label, group in train.groupby(target_col):
+                if label not in train_reservoirs:
+                    train_reservoirs[label] = Reservoir(sample_size, rng)
+                train_reservoirs[label].update(group)
+        else:
+            train_reservoirs.setdefault(None, Reservoir(sample_size, rng)).update(train)
+        test_reservoir.update(test)
+
+        if output_dir:
+            _append_csv(train, os.path.join(output_dir, "train.csv"))
+            _append_csv(test, os.path.join(output_dir, "test.csv"))
+
+    if feature_names is None:
+        raise ValueError(f"Aucune ligne exploitable dans {file_path}")
+
+    # Vocabulaire complet (train + test), encodage identique à LabelEncoder
+    encoders, mappings = {}, {}
+    for col in categorical:
+        le = LabelEncoder()
+        le.classes_ = np.array(sorted(categories[col]), dtype=object)
+        encoders[col] = le
+        mappings[col] = {label: i for i, label in enumerate(le.classes_)}
+    scaler = _build_scaler(feature_names, numeric_stats, train_categories, mappings)
+    baseline = build_baseline_from_stats(feature_names, numeric_stats, train_categories, encoders)
+
+    reservoirs = [r for r in train_reservoirs.values() if r.frame is not None]
+    train_frame = pd.concat([r.frame for r in reservoirs], ignore_index=True)
+    sample_weight = np.concatenate([np.full(len(r.frame), r.seen / len(r.frame)) for r in reservoirs])
+    test_frame = test_reservoir.frame if test_reservoir.frame is not None else train_frame.iloc[:0]
+
+    def encode(frame):
+        frame = frame.copy()
+        for col in categorical:
+            frame[col] = category_labels(frame[col]).map(mappings[col]).astype(int)
+        return frame
+
+    train_frame, test_frame = encode(train_frame), encode(test_frame)
+    # Médianes issues de l'échantillon de train uniquement (pas de fuite vers le test)
+    medians = train_frame[feature_names].median(numeric_only=True)
+    train_frame = train_frame.fillna(medians)
+    test_frame = test_frame.fillna(medians)
+
+    X_train = scaler.transform(train_frame[feature_names].to_numpy(dtype=np.float64))
+    X_test = scaler.transform(test_frame[feature_names].to_numpy(dtype=np.float64))
+    print(f"Split en flux : {sum(r.seen for r in reservoirs)} lignes train, "
+          f"{test_reservoir.seen} lignes test ; echantillons {len(X_train)} / {len(X_test)}")
+    return StreamingSplit(X_train, X_test, train_frame[target_col], test_frame[target_col],
+                          scaler, feature_names, encoders, sample_weight, baseline)
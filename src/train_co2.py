@@ -1,50 +1,53 @@
-import pandas as pd
 import os
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
-from preprocessing import load_co2_data, prepare_splits, export_metadata
-import skl2onnx
-from skl2onnx.common.data_types import FloatTensorType
-import onnx
+from .preprocessing import load_co2_data, prepare_splits, build_metadata
+from .onnx_export import export_artifacts, save_checkpoint
+from .drift_monitor import build_baseline_profile
+from .streaming_split import stream_splits
 
-def train_co2_model(csv_path):
+def train_co2_model(csv_path, profile="accuracy", export=True, streaming=False, model_dir="models"):
     print(f"--- Entrainement Empreinte Carbone sur {csv_path} ---")
     
-    # Prétraitement
-    df, encoders = load_co2_data(csv_path)
     # On cible 'CO2 Emissions(g/km)'
     target = 'CO2 Emissions(g/km)'
-    X_train, X_test, y_train, y_test, scaler, feature_names = prepare_splits(df, target_col=target)
+    
+    # Prétraitement
+    sample_weight = None
+    if streaming:
+        # Pas d'identifiant véhicule : hash de la ligne entière ; cible continue, pas de strates
+        split = stream_splits(csv_path, target, dataset="co2", key_col=None, stratify=False)
+        X_train, X_test, y_train, y_test, scaler, feature_names = split[:6]
+        encoders, sample_weight, baseline = split.encoders, split.sample_weight, split.baseline
+    else:
+        df, encoders = load_co2_data(csv_path)
+        X_train, X_test, y_train, y_test, scaler, feature_names = prepare_splits(df, target_col=target)
+        baseline = build_baseline_profile(df, feature_names, encoders)
     
     # Modèle de régression pour prédire une valeur continue
     model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    model.fit(X_train, y_train, sample_weight=sample_weight)
     
     # Évaluation
     y_pred = model.predict(X_test)
     print(f"R2 Score: {r2_score(y_test, y_pred):.4f}")
     print(f"MAE: {mean_absolute_error(y_test, y_pred):.2f} g/km")
     
-    # Export ONNX
-    initial_type = [('float_input', FloatTensorType([None, X_train.shape[1]]))]
-    onx = skl2onnx.convert_sklearn(model, initial_types=initial_type, target_opset=19)
-    
-    model_dir = "models"
-    if not os.path.exists(model_dir):
-        os.makedirs(model_dir)
-        
-    with open(os.path.join(
-        model_dir, "co2_model.onnx"), "wb") as f:
-        f.write(onx.SerializeToString())
-        
-    # Export Metadata
-    export_metadata(encoders, feature_names, os.path.join(model_dir, "co2_metadata.json"))
-    
-    print("SUCCESS: Modele CO2 exporte : models/co2_model.onnx")
+    # Estimateur sklearn conserve (avec metadata et profil de derive) pour un re-export sans re-entrainement
+    checkpoint_path = os.path.join(model_dir, "co2_model.joblib")
+    metadata = build_metadata(encoders, feature_names, scaler=scaler)
+    save_checkpoint(model, X_test, checkpoint_path, metadata=metadata, baseline=baseline)
 
-if __name__ == "__main__":
-    DATA_PATH = "data/CO2 Emissions_Canada.csv"
-    if os.path.exists(DATA_PATH):
-        train_co2_model(DATA_PATH)
-    else:
-        print("ERROR: Fichier " + DATA_PATH + " manquant.")
+    if not export:
+        # metadata.json et le profil restent ceux du modele ONNX deja livre
+        print(f"SUCCESS: Estimateur CO2 sauvegarde : {checkpoint_path} "
+              "(export ONNX : python -m src export co2)")
+        return
+
+    # Export ONNX selon le profil choisi (parite verifiee sur X_test), puis metadata
+    # pour Java et profil de reference pour la surveillance de derive
+    onnx_path = os.path.join(model_dir, "co2_model.onnx")
+    export_artifacts(model, X_test, onnx_path, profile=profile,
+                     metadata=metadata, metadata_path=os.path.join(model_dir, "co2_metadata.json"),
+                     baseline=baseline, baseline_path=os.path.join(model_dir, "co2_baseline.json"))
+    print(f"SUCCESS: Modele CO2 exporte : {onnx_path}")
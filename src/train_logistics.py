@@ -1,51 +1,52 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import os
-import sys
-sys.path.append(os.path.abspath('src'))
-from preprocessing import load_logistics_data, prepare_splits, export_metadata
-import skl2onnx
-from skl2onnx.common.data_types import FloatTensorType
-import onnx
+from .preprocessing import load_logistics_data, prepare_splits, build_metadata
+from .onnx_export import export_artifacts, save_checkpoint
+from .drift_monitor import build_baseline_profile
+from .streaming_split import stream_splits
 
-def train_logistics_model(csv_path):
+def train_logistics_model(csv_path, profile="accuracy", export=True, streaming=False, model_dir="models"):
     print(f"--- Entrainement Logistique sur {csv_path} ---")
     
-    # Prétraitement
-    df, encoders = load_logistics_data(csv_path)
     # Cible : Est-ce qu'une maintenance est requise pour assurer la livraison ?
     target = 'Maintenance_Required'
     
-    # On retire les colonnes non numériques ou ID avant split
-    X_train, X_test, y_train, y_test, scaler, feature_names = prepare_splits(df, target_col=target)
+    # Prétraitement
+    sample_weight = None
+    if streaming:
+        # Split en flux par Vehicle_ID, profil de dérive cumulé sur tout le train
+        split = stream_splits(csv_path, target, dataset="logistics")
+        X_train, X_test, y_train, y_test, scaler, feature_names = split[:6]
+        encoders, sample_weight, baseline = split.encoders, split.sample_weight, split.baseline
+    else:
+        df, encoders = load_logistics_data(csv_path)
+        # On retire les colonnes non numériques ou ID avant split
+        X_train, X_test, y_train, y_test, scaler, feature_names = prepare_splits(df, target_col=target)
+        baseline = build_baseline_profile(df, feature_names, encoders)
     
     model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    model.fit(X_train, y_train, sample_weight=sample_weight)
     
     # Évaluation
     y_pred = model.predict(X_test)
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
     
-    # Export ONNX
-    initial_type = [('float_input', FloatTensorType([None, X_train.shape[1]]))]
-    onx = skl2onnx.convert_sklearn(model, initial_types=initial_type, target_opset=19)
-    
-    model_dir = "models"
-    if not os.path.exists(model_dir):
-        os.makedirs(model_dir)
-        
-    with open(os.path.join(model_dir, "logistics_model.onnx"), "wb") as f:
-        f.write(onx.SerializeToString())
-    
-    # Export Metadata
-    export_metadata(encoders, feature_names, os.path.join(model_dir, "logistics_metadata.json"))
-    
-    print("SUCCESS: Modele Logistique exporte : models/logistics_model.onnx")
+    # Estimateur sklearn conserve (avec metadata et profil de derive) pour un re-export sans re-entrainement
+    checkpoint_path = os.path.join(model_dir, "logistics_model.joblib")
+    metadata = build_metadata(encoders, feature_names, scaler=scaler)
+    save_checkpoint(model, X_test, checkpoint_path, metadata=metadata, baseline=baseline)
 
-if __name__ == "__main__":
-    DATA_PATH = "data/logistics_dataset_with_maintenance_required.csv"
-    if os.path.exists(DATA_PATH):
-        train_logistics_model(DATA_PATH)
-    else:
-        print("ERROR: Fichier " + DATA_PATH + " manquant.")
+    if not export:
+        # metadata.json et le profil restent ceux du modele ONNX deja livre
+        print(f"SUCCESS: Estimateur Logistique sauvegarde : {checkpoint_path} "
+              "(export ONNX : python -m src export logistics)")
+        return
+
+    # Export ONNX selon le profil choisi (parite verifiee sur X_test), puis metadata
+    # pour Java et profil de reference pour la surveillance de derive
+    onnx_path = os.path.join(model_dir, "logistics_model.onnx")
+    export_artifacts(model, X_test, onnx_path, profile=profile,
+                     metadata=metadata, metadata_path=os.path.join(model_dir, "logistics_metadata.json"),
+                     baseline=baseline, baseline_path=os.path.join(model_dir, "logistics_baseline.json"))
+    print(f"SUCCESS: Modele Logistique exporte : {onnx_path}")
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from src.assignment import assign_missions, candidate_vehicles, pair_features, risk_candidates
+
+FEATURES = ['Load_Capacity', 'Actual_Load', 'Load_Utilization', 'Vehicle_Age']
+
+
+def _risk(X):
+    # Risque croissant avec l'âge du véhicule
+    return X[:, FEATURES.index('Vehicle_Age')] / 100.0
+
+
+def _fleet(n, rng):
+    return pd.DataFrame({
+        'Vehicle_ID': np.arange(n),
+        'Load_Capacity': rng.uniform(5.0, 50.0, n),
+        'Vehicle_Age': rng.uniform(0.0, 20.0, n),
+    })
+
+
+def test_identical_loads_are_all_assigned():
+    rng = np.random.default_rng(0)
+    vehicles = _fleet(2000, rng)
+    missions = pd.DataFrame({'Actual_Load': np.full(500, 10.0)})
+
+    result = assign_missions(vehicles, missions, _risk, FEATURES, k=8)
+
+    assert (result['vehicle_index'] >= 0).all()
+    assert result['vehicle_index'].is_unique
+    capacity = vehicles['Load_Capacity'].to_numpy()[result['vehicle_index']]
+    assert (capacity >= missions['Actual_Load'].to_numpy()).all()
+
+
+def test_candidates_spread_over_fleet():
+    capacity = np.arange(100, dtype=np.float64)
+    cand = candidate_vehicles(capacity, np.full(40, 10.0), k=4)
+
+    assert (capacity[cand[cand >= 0]] >= 10.0).all()
+    # Chaque mission a un véhicule glouton distinct parmi ses candidats
+    assert len(np.unique(cand)) >= 40
+
+
+def test_unmatched_missions_are_retried_with_wider_k():
+    # Véhicules de capacité 10 à 13 trop risqués pour les missions réelles, mais
+    # pas pour la mission médiane du risque a priori (charge 10.5)
+    capacity = np.arange(1.0, 101.0)
+    vehicles = pd.DataFrame({'Load_Capacity': capacity, 'Vehicle_Age': np.zeros(100)})
+    missions = pd.DataFrame({'Actual_Load': [10.0, 11.0]})
+
+    def risk(X):
+        load, cap = X[:, FEATURES.index('Actual_Load')], X[:, FEATURES.index('Load_Capacity')]
+        return np.where((cap <= 13) & (load == np.round(load)), 0.9, 0.0)
+
+    first_round = assign_missions(vehicles, missions, risk, FEATURES, k=2, max_risk=0.5, max_rounds=1)
+    result = assign_missions(vehicles, missions, risk, FEATURES, k=2, max_risk=0.5)
+
+    assert (first_round['vehicle_index'] < 0).all()
+    assert (capacity[result['vehicle_index']] >= 14).all()
+
+
+def test_missing_vehicle_feature_raises():
+    rng = np.random.default_rng(0)
+    vehicles = _fleet(10, rng).drop(columns=['Vehicle_Age'])
+    missions = pd.DataFrame({'Actual_Load': [10.0]})
+
+    with pytest.raises(KeyError, match='Vehicle_Age'):
+        assign_missions(vehicles, missions, _risk, FEATURES)
+
+
+def test_risk_candidates_reach_robust_oversized_vehicles():
+    capacity = np.arange(1.0, 101.0)
+    prior_risk = 1.0 - capacity / 100.0  # les plus gros véhicules sont les plus sûrs
+    cand = risk_candidates(capacity, np.full(3, 10.0), prior_risk, k=2)
+
+    # Listes décalées : chaque mission se réserve un véhicule sûr différent
+    assert sorted(cand[:, 0].tolist()) == [97, 98, 99]
+    assert (capacity[cand] >= 10.0).all()
+
+
+def test_close_to_dense_optimum():
+    rng = np.random.default_rng(3)
+    vehicles = _fleet(300, rng)
+    missions = pd.DataFrame({'Actual_Load': rng.uniform(2.0, 40.0, 150)})
+
+    def risk(X):
+        z = 0.15 * X[:, 3] - 2.5 + 1.5 * X[:, 2]
+        return 1.0 / (1.0 + np.exp(-z))
+
+    result = assign_missions(vehicles, missions, risk, FEATURES, k=16)
+
+    vehicle_X = vehicles.reindex(columns=FEATURES, fill_value=0.0).to_numpy(np.float32)
+    mission_X = missions.reindex(columns=FEATURES, fill_value=0.0).to_numpy(np.float32)
+    every_pair = np.tile(np.arange(len(vehicles)), (len(missions), 1))
+    utilization = missions['Actual_Load'].to_numpy()[:, None] / vehicles['Load_Capacity'].to_numpy()[None, :]
+    cost = risk(pair_features(vehicle_X, mission_X, every_pair, FEATURES, [1])).reshape(utilization.shape)
+    cost = np.where(utilization <= 1.0, cost + 0.1 * (1.0 - utilization), 1e6)
+    rows, cols = linear_sum_assignment(cost)
+
+    assert (result['vehicle_index'] >= 0).all()
+    assert result['cost'].sum() <= 1.02 * cost[rows, cols].sum()
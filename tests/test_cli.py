@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxruntime")
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from src import cli
+from src.drift_monitor import export_baseline_profile
+from src.onnx_export import export_onnx
+from src.preprocessing import export_metadata
+
+FEATURES = ['Engine Size(L)', 'Cylinders']
+
+
+@pytest.fixture
+def co2_model(tmp_path, monkeypatch):
+    """Modèle CO2 minimal exporté dans un dossier models/ temporaire."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Engine Size(L)': rng.uniform(1.0, 6.0, 300),
+                       'Cylinders': rng.integers(3, 9, 300).astype(float)})
+    df['CO2 Emissions(g/km)'] = 40 * df['Engine Size(L)'] + 5 * df['Cylinders']
+    scaler = StandardScaler().fit(df[FEATURES])
+    X = scaler.transform(df[FEATURES]).astype(np.float32)
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, df['CO2 Emissions(g/km)'])
+
+    model_dir = tmp_path / "models"
+    monkeypatch.setattr(cli, "MODEL_DIR", str(model_dir))
+    export_metadata({}, FEATURES, cli._artifact("co2", "metadata.json"), scaler=scaler)
+    export_onnx(model, X, cli._artifact("co2", "model.onnx"),
+                metadata_path=cli._artifact("co2", "metadata.json"))
+    batch = tmp_path / "lot.csv"
+    df.head(20).to_csv(batch, index=False)
+    return df, str(batch)
+
+
+def test_score_writes_predictions(co2_model, tmp_path):
+    _, batch = co2_model
+    output = tmp_path / "predictions.csv"
+    assert cli.main(["score", "co2", batch, "--output", str(output)]) == 0
+    assert len(pd.read_csv(output)) == 20
+
+
+def test_check_drift_fails_without_baseline(co2_model, capsys):
+    df, batch = co2_model
+    assert cli.main(["score", "co2", batch, "--check-drift"]) == 1
+    assert "ERROR: profil de reference" in capsys.readouterr().out
+
+    export_baseline_profile(df, FEATURES, {}, cli._artifact("co2", "baseline.json"))
+    assert cli.main(["score", "co2", batch, "--check-drift"]) == 0
+
+
+def test_train_without_export_keeps_shipped_artifacts(tmp_path, monkeypatch):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'Make': rng.choice(['FORD', 'KIA'], 200).astype(object),
+                       'Engine Size(L)': rng.uniform(1.0, 6.0, 200)})
+    df.loc[:9, 'Make'] = np.nan
+    df['CO2 Emissions(g/km)'] = 40 * df['Engine Size(L)']
+    data = tmp_path / "co2.csv"
+    df.to_csv(data, index=False)
+    model_dir = tmp_path / "models"
+    monkeypatch.setattr(cli, "MODEL_DIR", str(model_dir))
+    # Lancé depuis un autre dossier (ex. notebooks/) : les artefacts vont quand même dans MODEL_DIR
+    workdir = tmp_path / "notebooks"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    assert cli.main(["train", "co2", "--data", str(data), "--no-export"]) == 0
+    assert sorted(p.name for p in model_dir.iterdir()) == ["co2_model.joblib"]
+    assert not (workdir / "models").exists()
+
+    assert cli.main(["export", "co2", "--profile", "compressed"]) == 0
+    metadata = json.loads((model_dir / "co2_metadata.json").read_text())
+    assert metadata["onnx_output"] == {"profile": "compressed", "probabilities": None}
+    assert "nan" in metadata["mappings"]["Make"]
+    assert (model_dir / "co2_baseline.json").exists()
+    assert cli.main(["score", "co2", str(data), "--check-drift"]) == 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.drift_monitor import (SKETCH_ALPHA, DriftMonitor, NumericStats, QuantileSketch,
+                               build_baseline_profile)
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(3.0, 1.5, 50_000), -rng.exponential(2.0, 5_000),
+                             np.zeros(100)])
+    sketch = QuantileSketch().update(values)
+
+    for q in (0.01, 0.1, 0.25, 0.5, 0.9, 0.99, 0.999):
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= SKETCH_ALPHA * abs(exact) + 1e-12
+
+
+def test_merged_stats_match_single_pass():
+    rng = np.random.default_rng(1)
+    values = rng.normal(100.0, 15.0, 10_000)
+    edges = np.quantile(values, np.linspace(0, 1, 11)[1:-1])
+
+    whole = NumericStats(edges).update(values)
+    parts = NumericStats(edges).update(values[:3000]).merge(NumericStats(edges).update(values[3000:]))
+    restored = NumericStats.from_dict(parts.to_dict())
+
+    assert np.isclose(restored.mean, whole.mean) and np.isclose(restored.variance, whole.variance)
+    assert restored.sketch.positive == whole.sketch.positive
+    assert restored.quantile(0.95) == whole.quantile(0.95)
+
+
+def test_missing_rate_is_profiled_before_fill():
+    rng = np.random.default_rng(2)
+    train = pd.DataFrame({'Mileage': rng.normal(50_000, 5_000, 1000)})
+    train.loc[:49, 'Mileage'] = np.nan
+    baseline = build_baseline_profile(train, ['Mileage'])
+
+    assert baseline['Mileage']['missing'] == 50
+
+    batch = pd.DataFrame({'Mileage': rng.normal(50_000, 5_000, 200)})
+    batch.loc[:59, 'Mileage'] = np.nan
+    alerts = DriftMonitor(baseline).update(batch).check()
+
+    assert 'missing_rate' in [a['kind'] for a in alerts]
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src import notebook_pipeline
+from src.preprocessing import read_csv_cached
+
+
+def _write_notebook(path, cells, outputs=None):
+    nb = {
+        "cells": [{"cell_type": "code", "source": source, "metadata": {},
+                   "execution_count": None, "outputs": outputs or []} for source in cells],
+        "metadata": {}, "nbformat": 4, "nbformat_minor": 5,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(nb, f)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Mini dépôt : data/, src/ (a -> b, c isolé) et notebooks/."""
+    for name in ("data", "src", "notebooks"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "data" / "fleet.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "data" / "other.csv").write_text("a\n3\n")
+    (tmp_path / "src" / "a.py").write_text("from .b import helper\n")
+    (tmp_path / "src" / "b.py").write_text("import os\nhelper = 1\n")
+    (tmp_path / "src" / "c.py").write_text("x = 1\n")
+    monkeypatch.setattr(notebook_pipeline, "REPO_ROOT", str(tmp_path))
+    monkeypatch.setattr(notebook_pipeline, "SRC_DIR", str(tmp_path / "src"))
+    nb_path = tmp_path / "notebooks" / "analyse.ipynb"
+    _write_notebook(nb_path, ["from a import helper\n", "df = read_csv_cached('../data/fleet.csv')\n"])
+    return tmp_path, nb_path
+
+
+def test_src_dependencies_are_transitive(repo):
+    assert notebook_pipeline.src_dependencies("import a\nimport numpy\n") == {"a", "b"}
+    assert notebook_pipeline.src_dependencies("import numpy\n") == set()
+
+
+def test_inputs_are_referenced_csvs_and_imported_modules(repo):
+    root, nb_path = repo
+    with open(nb_path, encoding="utf-8") as f:
+        inputs = notebook_pipeline.notebook_inputs(json.load(f))
+    assert [os.path.relpath(p, root) for p in inputs] == [
+        os.path.join("data", "fleet.csv"), os.path.join("src", "a.py"), os.path.join("src", "b.py")]
+    assert notebook_pipeline.stale_datasets([(str(nb_path), None)]) == {str(root / "data" / "fleet.csv")}
+
+
+@pytest.mark.parametrize("change, stale", [
+    ("code", True), ("csv", True), ("imported_module", True),
+    ("outputs", False), ("unused_csv", False), ("unused_module", False),
+])
+def test_fingerprint_tracks_inputs(repo, change, stale):
+    root, nb_path = repo
+    before = notebook_pipeline.notebook_fingerprint(nb_path)
+    if change == "code":
+        _write_notebook(nb_path, ["from a import helper\n", "df = read_csv_cached('../data/fleet.csv')\ndf\n"])
+    elif change == "outputs":
+        _write_notebook(nb_path, ["from a import helper\n", "df = read_csv_cached('../data/fleet.csv')\n"],
+                        outputs=[{"output_type": "stream", "name": "stdout", "text": "ok"}])
+    elif change == "csv":
+        (root / "data" / "fleet.csv").write_text("a,b\n1,3\n")
+    elif change == "unused_csv":
+        (root / "data" / "other.csv").write_text("a\n4\n")
+    elif change == "imported_module":
+        (root / "src" / "b.py").write_text("helper = 2\n")
+    else:
+        (root / "src" / "c.py").write_text("x = 2\n")
+    assert (notebook_pipeline.notebook_fingerprint(nb_path) != before) == stale
+
+
+def test_read_csv_cached_invalidates_on_change(tmp_path):
+    csv = tmp_path / "fleet.csv"
+    cache = tmp_path / "cache"
+    csv.write_text("a\n1\n")
+    assert read_csv_cached(str(csv), cache_dir=str(cache))["a"].tolist() == [1]
+    assert len(os.listdir(cache)) == 1
+
+    # Même taille, mtime différent
+    csv.write_text("a\n2\n")
+    os.utime(csv, ns=(1, 1))
+    assert read_csv_cached(str(csv), cache_dir=str(cache))["a"].tolist() == [2]
+    # Taille différente
+    csv.write_text("a\n30\n")
+    os.utime(csv, ns=(1, 1))
+    pd.testing.assert_frame_equal(read_csv_cached(str(csv), cache_dir=str(cache)), pd.DataFrame({"a": [30]}))
+    assert len(os.listdir(cache)) == 3
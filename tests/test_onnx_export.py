@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxruntime")
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from src.onnx_export import PROFILES, build_profile, export_onnx
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def classifier(data):
+    X, y = data
+    return RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+
+
+@pytest.mark.parametrize("profile", list(PROFILES))
+def test_profiles_keep_parity(classifier, data, profile):
+    X, _ = data
+    _, report = build_profile(classifier, X, profile)
+
+    assert report["within_tolerance"]
+    assert report["parity"]["label_mismatch_rate"] == 0.0
+    assert report["parity"]["max_proba_abs_diff"] <= report["tolerance"]
+    assert report["probabilities"] == ("zipmap" if profile == "accuracy" else "tensor")
+    assert {"batch_ms", "single_row_ms"} <= set(report["latency"])
+
+
+def test_compressed_profile_is_smaller(classifier, data):
+    X, _ = data
+    _, accuracy = build_profile(classifier, X, "latency")
+    _, compressed = build_profile(classifier, X, "compressed")
+    assert compressed["size_bytes"] < 0.9 * accuracy["size_bytes"]
+
+
+def test_regressor_profiles_keep_parity(data):
+    X, _ = data
+    model = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0).fit(X, X[:, 0] * 3 + 10)
+    for profile in PROFILES:
+        _, report = build_profile(model, X, profile)
+        assert report["within_tolerance"] and report["probabilities"] is None
+
+
+def test_auto_records_selected_output_format(classifier, data, tmp_path):
+    X, _ = data
+    metadata_path = tmp_path / "m_metadata.json"
+    metadata_path.write_text(json.dumps({"features": [], "mappings": {}}))
+
+    report = export_onnx(classifier, X, str(tmp_path / "m_model.onnx"), profile="auto",
+                         metadata_path=str(metadata_path))
+
+    written = json.loads((tmp_path / "m_model_report.json").read_text())
+    assert written["selected"] == report["profile"]
+    assert set(written["profiles"]) == set(PROFILES)
+    fastest = min(written["profiles"].values(), key=lambda r: r["latency"]["batch_ms"])
+    assert report["profile"] == fastest["profile"]
+    assert json.loads(metadata_path.read_text())["onnx_output"] == {
+        "profile": report["profile"], "probabilities": report["probabilities"]}
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing import apply_metadata
+
+METADATA = {
+    "features": ["Mileage", "Fuel_Type"],
+    "mappings": {"Fuel_Type": {"Diesel": 0, "Petrol": 1}},
+    "scaler": {"mean": [1000.0, 0.5], "scale": [500.0, 0.5]},
+}
+
+
+def test_apply_metadata_encodes_and_scales():
+    batch = pd.DataFrame({"Mileage": [1500.0, 500.0], "Fuel_Type": ["Petrol", "Electric"]})
+
+    X = apply_metadata(batch, METADATA)
+
+    assert X.dtype == np.float32
+    np.testing.assert_allclose(X, [[1.0, 1.0], [-1.0, -3.0]])
+
+
+def test_apply_metadata_requires_scaler():
+    metadata = {k: v for k, v in METADATA.items() if k != "scaler"}
+    batch = pd.DataFrame({"Mileage": [1500.0], "Fuel_Type": ["Petrol"]})
+
+    with pytest.raises(ValueError, match="scaler"):
+        apply_metadata(batch, metadata)
+
+
+def test_missing_category_uses_training_label():
+    from sklearn.preprocessing import LabelEncoder
+
+    from src.preprocessing import build_metadata, category_labels
+
+    train = pd.Series(["Diesel", None, "Petrol"])
+    encoder = LabelEncoder().fit(category_labels(train))
+    metadata = build_metadata({"Fuel_Type": encoder}, ["Fuel_Type"])
+    metadata["scaler"] = {"mean": [0.0], "scale": [1.0]}
+
+    X = apply_metadata(pd.DataFrame({"Fuel_Type": [np.nan, "Petrol"]}), metadata)
+
+    assert X[:, 0].tolist() == [2.0, 1.0]  # Diesel, Petrol, nan
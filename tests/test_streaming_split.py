@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.drift_monitor import NumericStats
+from src.preprocessing import load_co2_data
+from src.streaming_split import stream_splits
+
+
+@pytest.fixture
+def co2_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({
+        'Vehicle_ID': rng.integers(0, 500, n),
+        'Make': rng.choice(['FORD', 'KIA', 'BMW'], n),
+        'Engine Size(L)': rng.uniform(1.0, 6.0, n),
+        'CO2 Emissions(g/km)': rng.normal(250.0, 50.0, n),
+    })
+    df.loc[rng.random(n) < 0.1, 'Engine Size(L)'] = np.nan
+    df.loc[rng.random(n) < 0.05, 'Make'] = np.nan
+    path = tmp_path / 'co2.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_missing_key_column_raises(co2_csv):
+    with pytest.raises(KeyError, match='key_col=None'):
+        stream_splits(co2_csv, 'CO2 Emissions(g/km)', 'co2', key_col='Plate', stratify=False)
+
+
+def test_vehicles_never_cross_the_split(co2_csv, tmp_path):
+    out = tmp_path / 'split'
+    stream_splits(co2_csv, 'CO2 Emissions(g/km)', 'co2', stratify=False, chunksize=700, output_dir=out)
+
+    train, test = pd.read_csv(out / 'train.csv'), pd.read_csv(out / 'test.csv')
+    assert not set(train['Vehicle_ID']) & set(test['Vehicle_ID'])
+    assert len(train) + len(test) == 5000
+
+
+def test_baseline_covers_every_train_row_before_fill(co2_csv, tmp_path):
+    out = tmp_path / 'split'
+    split = stream_splits(co2_csv, 'CO2 Emissions(g/km)', 'co2', key_col=None, stratify=False,
+                          chunksize=700, sample_size=500, output_dir=out)
+    train = pd.read_csv(out / 'train.csv')
+
+    engine = NumericStats.from_dict(split.baseline['Engine Size(L)'])
+    assert engine.count + engine.missing == len(train)
+    assert engine.missing == train['Engine Size(L)'].isna().sum()
+    assert np.isclose(engine.mean, train['Engine Size(L)'].mean())
+    assert engine.hist.sum() == engine.count
+    make = split.baseline['Make']
+    assert make['missing'] == train['Make'].isna().sum() > 0
+    assert sum(make['counts'].values()) + make['missing'] == len(train)
+
+
+def test_missing_categories_encoded_like_load_data(co2_csv):
+    split = stream_splits(co2_csv, 'CO2 Emissions(g/km)', 'co2', key_col=None, stratify=False, chunksize=700)
+    _, encoders = load_co2_data(str(co2_csv))
+
+    assert list(split.encoders['Make'].classes_) == list(encoders['Make'].classes_) == ['BMW', 'FORD', 'KIA', 'nan']
+    assert split.X_train.shape[1] == len(split.feature_names)
+
+
+def test_logistics_with_missing_weather(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 1000
+    df = pd.DataFrame({
+        'Vehicle_ID': rng.integers(0, 100, n),
+        'Weather_Conditions': rng.choice(['Clear', 'Rain'], n).astype(object),
+        'Actual_Load': rng.uniform(1.0, 10.0, n),
+        'Load_Capacity': rng.uniform(10.0, 20.0, n),
+        'Maintenance_Required': rng.integers(0, 2, n),
+    })
+    df.loc[:20, 'Weather_Conditions'] = np.nan
+    path = tmp_path / 'logistics.csv'
+    df.to_csv(path, index=False)
+
+    split = stream_splits(path, 'Maintenance_Required', 'logistics', chunksize=300)
+
+    assert 'nan' in split.encoders['Weather_Conditions'].classes_
+    assert split.baseline['Weather_Conditions']['missing'] > 0